@@ -5,94 +5,85 @@ Samples are separated by '---' and reports any samples over 2000 characters.
 Analyzes all .txt files in the current directory.
 """
 
-import os
-import glob
-from collections import defaultdict
+import re
 
-def analyze_file(filename):
+from sample_index import build_index, list_txt_files, map_files
+
+# Blank lines at the start and end of a sample are not part of its content
+LEADING_BLANK_LINES = re.compile(r'(?:[^\S\n]*\n)*')
+TRAILING_BLANK_LINES = re.compile(r'\n\s*\Z')
+BLANK = re.compile(r'\s*')
+
+# Samples longer than this many characters are reported
+CHAR_LIMIT = 2000
+
+def analyze_file(filename, index=None):
     """
     Analyze the file for sample character counts.
     
     Args:
         filename (str): Path to the file to analyze
+        index (SampleIndex, optional): Index of the file, built (or loaded from cache) if omitted
     
     Returns:
-        list: List of tuples (sample_num, char_count, start_line, end_line) for samples over 2000 chars
+        list: List of tuples (sample_num, char_count, start_line, end_line) for samples over CHAR_LIMIT chars
     """
-    try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-    except FileNotFoundError:
-        print(f"Error: File '{filename}' not found.")
-        return []
-    except UnicodeDecodeError:
-        print(f"Error: Unable to decode file '{filename}'. Trying with different encoding...")
+    if index is None:
         try:
-            with open(filename, 'r', encoding='latin-1') as file:
-                lines = file.readlines()
-        except Exception as e:
-            print(f"Error reading file: {e}")
+            index = build_index(filename)
+        except FileNotFoundError:
+            print(f"Error: File '{filename}' not found.")
             return []
+        except UnicodeDecodeError:
+            print(f"Error: Unable to decode file '{filename}'. Trying with different encoding...")
+            try:
+                index = build_index(filename, encoding='latin-1')
+            except Exception as e:
+                print(f"Error reading file: {e}")
+                return []
+    
+    return list(iter_samples(index, CHAR_LIMIT))
+
+def iter_samples(index, min_chars=0):
+    """
+    Yield the character count and content line range of every sample.
+    
+    Samples are measured as offset ranges between the index's separators, so
+    no per-line strings are built. A sample whose whole span is no longer than
+    min_chars cannot qualify, so it is skipped before any trimming is done.
+    
+    Args:
+        index (SampleIndex): Index of the file
+        min_chars (int): Only yield samples with more characters than this
     
-    oversized_samples = []
-    sample_num = 0
-    i = 0
+    Yields:
+        tuple: (sample_num, char_count, start_line, end_line) for each non-empty sample over min_chars
+    """
+    content = index.content
+    separators = index.separators
     
-    while i < len(lines):
-        line = lines[i].strip()
+    for sample_num, (_, separator_end) in enumerate(separators, 1):
+        sample_start = separator_end + 1
+        sample_end = separators[sample_num][0] if sample_num < len(separators) else len(content)
         
-        # Look for separator
-        if line == '---':
-            sample_num += 1
-            separator_line = i
-            i += 1
-            
-            # Skip empty lines after separator
-            sample_start_line = i
-            while i < len(lines) and lines[i].strip() == '':
-                i += 1
-            
-            # Mark the actual content start
-            content_start_line = i
-            sample_content = []
-            
-            # Collect all lines until next separator or end of file
-            while i < len(lines):
-                current_line = lines[i].rstrip('\n\r')  # Remove only line endings, keep other whitespace
-                
-                # Check if we hit the next separator
-                if current_line.strip() == '---':
-                    break
-                
-                sample_content.append(current_line)
-                i += 1
-            
-            # Calculate character count (excluding the separator line breaks)
-            # Join with newlines to preserve original structure
-            if sample_content:
-                # Remove trailing empty lines
-                while sample_content and sample_content[-1].strip() == '':
-                    sample_content.pop()
-                
-                if sample_content:  # Only process if there's actual content
-                    content_text = '\n'.join(sample_content)
-                    char_count = len(content_text)
-                    
-                    # If over 2000 characters, record it
-                    if char_count > 2000:
-                        content_end_line = content_start_line + len(sample_content)
-                        oversized_samples.append((sample_num, char_count, content_start_line + 1, content_end_line))
-            
-            # Don't increment i here since we might have stopped at a separator
+        if sample_end - sample_start <= min_chars:
             continue
         
-        i += 1
-    
-    return oversized_samples
+        # Skip empty lines after separator, then drop trailing empty lines
+        content_start = LEADING_BLANK_LINES.match(content, sample_start, sample_end).end()
+        trailing = TRAILING_BLANK_LINES.search(content, content_start, sample_end)
+        content_end = trailing.start() if trailing else sample_end
+        
+        if BLANK.fullmatch(content, content_start, content_end):
+            continue
+        
+        char_count = content_end - content_start
+        if char_count > min_chars:
+            yield sample_num, char_count, index.line_of(content_start), index.line_of(content_end - 1)
 
 def report_oversized_samples(filename, oversized_samples):
     """
-    Report samples that exceed 2000 characters.
+    Report samples that exceed CHAR_LIMIT characters.
     
     Args:
         filename (str): Name of the file being analyzed
@@ -102,14 +93,14 @@ def report_oversized_samples(filename, oversized_samples):
         return
     
     print(f"\n=== FILE: {filename} ===")
-    print(f"Found {len(oversized_samples)} sample(s) over 2000 characters:\n")
+    print(f"Found {len(oversized_samples)} sample(s) over {CHAR_LIMIT} characters:\n")
     
     for sample_num, char_count, start_line, end_line in oversized_samples:
         print(f"Sample #{sample_num}:")
         print(f"  - Character count: {char_count:,}")
         print(f"  - Content starts at line: {start_line}")
         print(f"  - Content ends at line: {end_line}")
-        print(f"  - Exceeds limit by: {char_count - 2000:,} characters")
+        print(f"  - Exceeds limit by: {char_count - CHAR_LIMIT:,} characters")
         print()
 
 def main():
@@ -117,21 +108,22 @@ def main():
     Main function to analyze all .txt files in current directory.
     """
     # Find all .txt files in current directory
-    txt_files = glob.glob("*.txt")
+    txt_files = list_txt_files()
     
     if not txt_files:
         print("No .txt files found in current directory.")
         return
     
-    print(f"Analyzing {len(txt_files)} .txt file(s) for samples over 2000 characters...")
+    print(f"Analyzing {len(txt_files)} .txt file(s) for samples over {CHAR_LIMIT} characters...")
     print("=" * 60)
     
+    # Files are independent, so large corpora are analyzed in parallel
+    results = map_files(analyze_file, txt_files)
+    
     total_oversized = 0
     files_with_oversized = 0
     
-    for filename in sorted(txt_files):
-        oversized_samples = analyze_file(filename)
-        
+    for filename, oversized_samples in zip(txt_files, results):
         if oversized_samples:
             files_with_oversized += 1
             total_oversized += len(oversized_samples)
@@ -145,9 +137,9 @@ def main():
     print(f"Total oversized samples: {total_oversized}")
     
     if total_oversized == 0:
-        print("\n✅ All samples are within the 2000 character limit!")
+        print(f"\n✅ All samples are within the {CHAR_LIMIT} character limit!")
     else:
-        print(f"\n⚠️  Found {total_oversized} sample(s) exceeding 2000 characters across {files_with_oversized} file(s).")
+        print(f"\n⚠️  Found {total_oversized} sample(s) exceeding {CHAR_LIMIT} characters across {files_with_oversized} file(s).")
 
 if __name__ == "__main__":
     main()
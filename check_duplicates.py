@@ -6,104 +6,141 @@ Provides exact line numbers for each sample.
 """
 
 import re
-from collections import defaultdict
+from array import array
+from collections import Counter
+from typing import Dict, List, NamedTuple, Tuple
 
-def analyze_file(filename):
+from sample_index import build_index
+
+# Blank lines between a separator and the sample's first line are skipped
+LEADING_BLANK_LINES = re.compile(r'(?:[^\S\n]*\n)*')
+
+# The first run of word characters always starts on a word boundary, so no \b is
+# needed; without it the engine can skip ahead to the first word character
+FIRST_WORD_PATTERN = re.compile(r'\w+')
+
+class FirstWords(NamedTuple):
+    """First words of a file's samples, with occurrence lists only for repeated words."""
+    counts: Counter
+    duplicates: Dict[str, List[Tuple[int, int]]]
+
+def analyze_file(filename, index=None):
     """
     Analyze the file for potential duplicate samples based on first words.
     
     Args:
         filename (str): Path to the file to analyze
+        index (SampleIndex, optional): Index of the file, built (or loaded from cache) if omitted
     
     Returns:
-        dict: Dictionary with first words as keys and list of (sample_num, exact_line_num) as values
+        FirstWords: Count of every first word, and (sample_num, exact_line_num) lists for repeated ones
     """
-    try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-    except FileNotFoundError:
-        print(f"Error: File '{filename}' not found.")
-        return {}
-    except UnicodeDecodeError:
-        print(f"Error: Unable to decode file '{filename}'. Trying with different encoding...")
+    if index is None:
         try:
-            with open(filename, 'r', encoding='latin-1') as file:
-                lines = file.readlines()
-        except Exception as e:
-            print(f"Error reading file: {e}")
-            return {}
+            index = build_index(filename)
+        except FileNotFoundError:
+            print(f"Error: File '{filename}' not found.")
+            return FirstWords(Counter(), {})
+        except UnicodeDecodeError:
+            print(f"Error: Unable to decode file '{filename}'. Trying with different encoding...")
+            try:
+                index = build_index(filename, encoding='latin-1')
+            except Exception as e:
+                print(f"Error reading file: {e}")
+                return FirstWords(Counter(), {})
+    
+    return collect_first_words(index)
+
+def collect_first_words(index):
+    """
+    Collect the first word of every sample in an indexed file.
+    
+    Only the first non-blank line after each separator is searched. Most first
+    words are unique, so words are counted first and (sample_num, line) lists
+    are only built for words that occur more than once.
     
-    # Dictionary to store first words and their occurrences
-    first_words = defaultdict(list)
+    Args:
+        index (SampleIndex): Index of the file
+    
+    Returns:
+        FirstWords: Count of every first word, and (sample_num, exact_line_num) lists for repeated ones
+    """
+    content = index.content
+    
+    # First word, sample number and first line offset of each sample, as parallel columns
+    words = []
+    sample_nums = array('i')
+    line_starts = array('q')
     
     sample_num = 0
-    i = 0
+    # End of the last line read as a sample's first line
+    consumed_end = -1
     
-    while i < len(lines):
-        line = lines[i].strip()
+    for separator_start, separator_end in index.separators:
+        # A separator read as the previous sample's first line does not start a sample
+        if separator_start < consumed_end:
+            continue
+        
+        sample_num += 1
         
-        # Look for separator
-        if line == '---':
-            sample_num += 1
-            i += 1
-            
-            # Skip empty lines after separator
-            while i < len(lines) and lines[i].strip() == '':
-                i += 1
-            
-            # Now we should be at the first content line of the sample
-            if i < len(lines):
-                content_line = lines[i].strip()
-                
-                # Extract first word from this line
-                if content_line:
-                    # Find first meaningful word
-                    first_word_match = re.search(r'\b\w+', content_line)
-                    
-                    if first_word_match:
-                        first_word = first_word_match.group().lower()
-                        
-                        # Store sample number and exact line number (1-indexed)
-                        exact_line_num = i + 1
-                        first_words[first_word].append((sample_num, exact_line_num))
+        # Skip empty lines after separator
+        line_start = LEADING_BLANK_LINES.match(content, separator_end + 1).end()
+        if line_start >= len(content):
+            break
         
-        i += 1
+        # This is the first content line of the sample, even if it is '---'
+        line_end = content.find('\n', line_start)
+        consumed_end = line_end if line_end != -1 else len(content)
+        
+        # Find first meaningful word
+        first_word_match = FIRST_WORD_PATTERN.search(content, line_start, consumed_end)
+        
+        if first_word_match:
+            words.append(first_word_match.group().lower())
+            sample_nums.append(sample_num)
+            line_starts.append(line_start)
+    
+    counts = Counter(words)
+    
+    # Store sample number and exact line number (1-indexed) of repeated words only
+    duplicates = {}
+    for word, sample_num, line_start in zip(words, sample_nums, line_starts):
+        if counts[word] > 1:
+            duplicates.setdefault(word, []).append((sample_num, index.line_of(line_start)))
     
-    return first_words
+    return FirstWords(counts, duplicates)
 
-def report_duplicates(first_words_dict):
+def report_duplicates(first_words):
     """
     Report potential duplicates based on first words.
     
     Args:
-        first_words_dict (dict): Dictionary from analyze_file function
+        first_words (FirstWords): Result of the analyze_file function
     """
-    duplicates_found = False
+    counts, duplicates = first_words
     
     print("=== DUPLICATE SAMPLE ANALYSIS ===\n")
     
-    for first_word, occurrences in first_words_dict.items():
-        if len(occurrences) > 1:
-            duplicates_found = True
-            print(f"First word: '{first_word}' appears {len(occurrences)} times:")
-            for sample_num, line_num in occurrences:
-                print(f"  - Sample #{sample_num} at line {line_num}")
-            print()
+    for first_word, occurrences in duplicates.items():
+        print(f"First word: '{first_word}' appears {len(occurrences)} times:")
+        for sample_num, line_num in occurrences:
+            print(f"  - Sample #{sample_num} at line {line_num}")
+        print()
     
-    if not duplicates_found:
+    if not duplicates:
         print("No potential duplicates found based on first words.")
     
     # Summary statistics
-    total_samples = sum(len(occurrences) for occurrences in first_words_dict.values())
-    unique_first_words = len(first_words_dict)
+    total_samples = sum(counts.values())
+    unique_first_words = len(counts)
     
     print(f"=== SUMMARY ===")
     print(f"Total samples analyzed: {total_samples}")
     print(f"Unique first words: {unique_first_words}")
     
-    if duplicates_found:
-        duplicate_groups = sum(1 for occurrences in first_words_dict.values() if len(occurrences) > 1)
-        potential_duplicates = sum(len(occurrences) - 1 for occurrences in first_words_dict.values() if len(occurrences) > 1)
+    if duplicates:
+        duplicate_groups = len(duplicates)
+        potential_duplicates = sum(len(occurrences) - 1 for occurrences in duplicates.values())
         print(f"Groups with potential duplicates: {duplicate_groups}")
         print(f"Total potential duplicate samples: {potential_duplicates}")
 
@@ -114,11 +151,11 @@ def main():
     print("Looking for potential duplicates based on first words...\n")
     
     # Analyze the file
-    first_words_dict = analyze_file(filename)
+    first_words = analyze_file(filename)
     
-    if first_words_dict:
+    if first_words.counts:
         # Report results
-        report_duplicates(first_words_dict)
+        report_duplicates(first_words)
     else:
         print("Analysis failed or no data found.")
 
@@ -5,67 +5,87 @@ Counts the number of samples in all .txt files in the current directory.
 Samples are separated by lines containing only '---'.
 Analyzes quote tags to identify positive and negative examples.
 """
-import os
-import glob
 import re
-from typing import Dict, Tuple, List
+from typing import Dict, NamedTuple
 
-def analyze_samples_in_file(filename: str) -> Tuple[int, int, int]:
+from sample_index import build_index, list_txt_files, map_files
+
+NON_BLANK_PATTERN = re.compile(r'\S')
+
+class FileStats(NamedTuple):
+    """Sample counts of one file, all gathered in a single scan."""
+    total: int
+    with_quotes: int
+    without_quotes: int
+
+def has_quote_tag(content: str, start: int, end: int) -> bool:
+    """Check whether content[start:end] contains '<quote' (any case) followed by a '>'."""
+    # Only the five characters after each '<' are lowercased, so content is never copied
+    tag_start = content.find('<', start, end)
+    while tag_start != -1:
+        if content[tag_start + 1:tag_start + 6].lower() == 'quote':
+            return content.find('>', tag_start + 6, end) != -1
+        tag_start = content.find('<', tag_start + 1, end)
+    return False
+
+def scan_file(filename: str, index=None) -> FileStats:
     """
     Analyze samples in a single file.
     
+    Args:
+        filename: Path to the file to analyze
+        index: SampleIndex of the file, built (or loaded from cache) if omitted
+    
+    Returns:
+        FileStats of (total, with_quotes, without_quotes)
+    """
+    if index is None:
+        try:
+            index = build_index(filename)
+        except (FileNotFoundError, UnicodeDecodeError) as e:
+            print(f"Error reading {filename}: {e}")
+            return FileStats(0, 0, 0)
+    
+    return count_samples(index)
+
+# Earlier name of scan_file; FileStats still unpacks as the old 3-tuple
+analyze_samples_in_file = scan_file
+
+def count_samples(index) -> FileStats:
+    """
+    Count samples in an indexed file.
+    
     Returns:
-        Tuple of (total_samples, samples_with_quotes, samples_without_quotes)
+        FileStats of (total, with_quotes, without_quotes)
     """
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except (FileNotFoundError, UnicodeDecodeError) as e:
-        print(f"Error reading {filename}: {e}")
-        return 0, 0, 0
-    
-    lines = content.split('\n')
+    content = index.content
     total_samples = 0
     samples_with_quotes = 0
     samples_without_quotes = 0
-    current_sample_content = []
-    
-    # Regex pattern to match <quote> tags with optional attributes
-    quote_pattern = re.compile(r'<quote[^>]*>', re.IGNORECASE)
-    
-    for line in lines:
-        if line.strip() == '---':
-            # Process the current sample if it has content
-            if any(line.strip() for line in current_sample_content):
-                total_samples += 1
-                sample_text = '\n'.join(current_sample_content)
-                
-                # Check if sample contains any <quote> tags
-                if quote_pattern.search(sample_text):
-                    samples_with_quotes += 1
-                else:
-                    samples_without_quotes += 1
-            
-            current_sample_content = []
-        else:
-            current_sample_content.append(line)
     
-    # Process the last sample if it has content
-    if any(line.strip() for line in current_sample_content):
-        total_samples += 1
-        sample_text = '\n'.join(current_sample_content)
+    # Each sample is the span between two separator lines
+    sample_start = 0
+    boundaries = index.separators + [(len(content), len(content))]
+    
+    for separator_start, separator_end in boundaries:
+        # Process the current sample if it has content
+        if NON_BLANK_PATTERN.search(content, sample_start, separator_start):
+            total_samples += 1
+            
+            # Check if sample contains any <quote> tags
+            if has_quote_tag(content, sample_start, separator_start):
+                samples_with_quotes += 1
+            else:
+                samples_without_quotes += 1
         
-        if quote_pattern.search(sample_text):
-            samples_with_quotes += 1
-        else:
-            samples_without_quotes += 1
+        sample_start = separator_end
     
-    return total_samples, samples_with_quotes, samples_without_quotes
+    return FileStats(total_samples, samples_with_quotes, samples_without_quotes)
 
 def main():
     """Main function to analyze samples in all .txt files."""
     # Get all .txt files in the current directory
-    txt_files = glob.glob('*.txt')
+    txt_files = list_txt_files()
     
     if not txt_files:
         print("No .txt files found in the current directory.")
@@ -74,16 +94,19 @@ def main():
     total_samples = 0
     total_with_quotes = 0
     total_without_quotes = 0
-    file_results: Dict[str, Tuple[int, int, int]] = {}
+    file_results: Dict[str, FileStats] = {}
     
     print("Analyzing samples in .txt files...")
     print("=" * 95)
     print(f"{'File':<45} {'Total':<8} {'With <quote>':<12} {'Without <quote>':<15} {'Negative %':<10}")
     print("-" * 95)
     
-    for filename in sorted(txt_files):
-        samples, with_quotes, without_quotes = analyze_samples_in_file(filename)
-        file_results[filename] = (samples, with_quotes, without_quotes)
+    # Files are independent, so large corpora are analyzed in parallel
+    results = map_files(scan_file, txt_files)
+    
+    for filename, stats in zip(txt_files, results):
+        file_results[filename] = stats
+        samples, with_quotes, without_quotes = stats
         
         total_samples += samples
         total_with_quotes += with_quotes
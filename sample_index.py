@@ -0,0 +1,155 @@
+"""
+Shared Sample Index
+Reads a sample file once and records where its separators, lines and tags are,
+so that several analyses of the same file in one process do not repeat the
+read and scan. The scripts' main() functions also list and map over the corpus
+files through this module.
+"""
+
+import os
+import re
+import mmap
+from functools import lru_cache, cached_property
+from typing import Callable, List, Tuple, TypeVar
+from dataclasses import dataclass, field
+
+# Files larger than this are memory-mapped and decoded in place instead of read()
+MMAP_THRESHOLD = 1 << 20
+
+# Number of indexes kept in memory; each holds its file's full text
+INDEX_CACHE_SIZE = 1
+
+# Corpora smaller than this many bytes are analyzed in a single process
+PARALLEL_MIN_BYTES = 8 << 20
+
+# A separator is a line containing only '---' (surrounding whitespace allowed);
+# it is matched from the start of a line that contains a literal '---'
+SEPARATOR_PATTERN = re.compile(r'[^\S\n]*---[^\S\n]*$', re.MULTILINE)
+
+# Tags never span lines, so the attribute part stops at a newline
+TAG_PATTERN = re.compile(r'<(/?)(\w+)([^>\n]*)>')
+
+@dataclass
+class SampleIndex:
+    content: str
+    encoding: str
+    # (start, end) offsets of each separator line, excluding its newline
+    separators: List[Tuple[int, int]]
+    # Offset and line number of the last line_of() lookup
+    _line_cursor: Tuple[int, int] = field(default=(0, 1), init=False, repr=False, compare=False)
+    
+    @cached_property
+    def tags(self) -> List[Tuple[int, str, str, str]]:
+        """(offset, is_closing, tag_name, attributes) for every XML-like tag, scanned on first use."""
+        return [(match.start(), match[1], match[2], match[3]) for match in TAG_PATTERN.finditer(self.content)]
+    
+    def line_of(self, offset: int) -> int:
+        """
+        Return the 1-based line number of a character offset in content; a newline belongs to the line it ends.
+        
+        Only the newlines between the previous lookup and this one are counted,
+        so the scripts' lookups, made in increasing offset order, cost one
+        str.count pass over the text in total and no per-line storage.
+        """
+        cursor_offset, cursor_line = self._line_cursor
+        if offset >= cursor_offset:
+            line = cursor_line + self.content.count('\n', cursor_offset, offset)
+        else:
+            line = cursor_line - self.content.count('\n', offset, cursor_offset)
+        self._line_cursor = (offset, line)
+        return line
+
+def read_text(filename: str, encoding: str = 'utf-8') -> str:
+    """
+    Read a file with universal newlines.
+    
+    The bytes are decoded in one call rather than through a text-mode file;
+    large files are decoded straight from a memory map instead of read().
+    """
+    if os.path.getsize(filename) <= MMAP_THRESHOLD:
+        with open(filename, 'rb') as f:
+            content = f.read().decode(encoding)
+    else:
+        with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            content = str(mapped, encoding)
+    
+    # Match text-mode newline translation; replace() returns the same string when there is no '\r'
+    return content.replace('\r\n', '\n').replace('\r', '\n')
+
+def find_separators(content: str) -> List[Tuple[int, int]]:
+    """
+    Find the (start, end) offsets of all separator lines.
+    
+    A regex anchored at every line start has no literal prefix to skip ahead
+    with, so candidates are found with str.find('---') and only their lines
+    are checked against the separator pattern.
+    """
+    separators = []
+    candidate = content.find('---')
+    while candidate != -1:
+        line_start = content.rfind('\n', 0, candidate) + 1
+        separator = SEPARATOR_PATTERN.match(content, line_start)
+        if separator:
+            separators.append(separator.span())
+            candidate = content.find('---', separator.end())
+        else:
+            # Any later '---' on this line fails too, so go on from the next line;
+            # line_start is then looked up once per line rather than per candidate
+            line_end = content.find('\n', candidate)
+            if line_end == -1:
+                break
+            candidate = content.find('---', line_end)
+    return separators
+
+def build_index(filename: str, encoding: str = 'utf-8') -> SampleIndex:
+    """
+    Return the index of a file, reusing the last one built in this process if
+    the file's modification time and size are unchanged.
+    
+    Raises:
+        FileNotFoundError: If the file does not exist
+        UnicodeDecodeError: If the file cannot be decoded with the given encoding
+    """
+    stat = os.stat(filename)
+    return _build_index(os.path.abspath(filename), encoding, stat.st_mtime_ns, stat.st_size)
+
+@lru_cache(maxsize=INDEX_CACHE_SIZE)
+def _build_index(path: str, encoding: str, mtime_ns: int, size: int) -> SampleIndex:
+    """Read the file and index it; arguments after path are cache keys."""
+    content = read_text(path, encoding)
+    return SampleIndex(
+        content=content,
+        encoding=encoding,
+        separators=find_separators(content),
+    )
+
+def list_txt_files() -> List[str]:
+    """Return the sorted names of the non-hidden .txt files in the current directory."""
+    return sorted(
+        entry.name for entry in os.scandir('.')
+        if entry.name.endswith('.txt') and not entry.name.startswith('.') and entry.is_file()
+    )
+
+def use_process_pool(filenames: List[str]) -> bool:
+    """
+    Decide whether analyzing these files in worker processes is worth its startup cost.
+    
+    Starting a pool takes tens of milliseconds, which is longer than a serial
+    pass over a small corpus, so it is only used for several files adding up
+    to at least PARALLEL_MIN_BYTES on a machine with more than one CPU.
+    """
+    if len(filenames) < 2 or (os.cpu_count() or 1) < 2:
+        return False
+    return sum(os.path.getsize(filename) for filename in filenames) >= PARALLEL_MIN_BYTES
+
+T = TypeVar('T')
+
+def map_files(function: Callable[[str], T], filenames: List[str]) -> List[T]:
+    """Apply function to every file, in parallel if use_process_pool() allows; results keep the input order."""
+    if not use_process_pool(filenames):
+        return [function(filename) for filename in filenames]
+    
+    # Imported here because loading multiprocessing alone costs as much as a small run
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(function, filenames, chunksize=4))
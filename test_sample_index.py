@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Regression tests for sample_index.
+
+The index replaces per-line parsing with offset arithmetic, so its results are
+compared with a straightforward line-by-line reading of the same text, in the
+style of the scripts before the index existed. Run with `python -m unittest`.
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import sample_index
+from sample_index import TAG_PATTERN, build_index
+
+# Lines that exercise separators, blank lines, whitespace variants and tags
+LINES = [
+    '---', '--- ', ' ---', '\t---\t', '----', '-- -', 'a --- b', '---x',
+    '', ' ', '\t', '\x0c',
+    'alpha', 'Alpha beta', 'ṛṣi uvāca',
+    '<quote id="q1">text</quote>', '<author authorid="a">', '</author>',
+    '<title x=1>', 'a < b > c', '<bad', '</quote>',
+]
+
+def reference_index(content):
+    """
+    Index content line by line.
+    
+    Returns:
+        tuple: (separator line numbers, line start offsets, tags) with tags as
+        (line_number, is_closing, tag_name, attributes)
+    """
+    separator_lines = []
+    line_starts = []
+    tags = []
+    offset = 0
+    
+    for line_number, line in enumerate(content.split('\n'), 1):
+        line_starts.append(offset)
+        if line.strip() == '---':
+            separator_lines.append(line_number)
+        for match in TAG_PATTERN.finditer(line):
+            tags.append((line_number, *match.groups()))
+        offset += len(line) + 1
+    
+    return separator_lines, line_starts, tags
+
+def random_text(rnd):
+    """Join random LINES with a random line ending style."""
+    newline = rnd.choice(['\n', '\r\n', '\r'])
+    text = newline.join(rnd.choice(LINES) for _ in range(rnd.randint(0, 15)))
+    return text + rnd.choice(['', newline])
+
+class SampleIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_count = 0
+        sample_index._build_index.cache_clear()
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def write(self, text):
+        """Write text to a new file and return its path."""
+        self.file_count += 1
+        path = os.path.join(self.directory, f"sample{self.file_count}.txt")
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        return path
+    
+    def assert_matches_reference(self, index, text):
+        with open(self.write(text), 'r', encoding='utf-8') as f:
+            content = f.read()
+        self.assertEqual(index.content, content)
+        
+        separator_lines, line_starts, tags = reference_index(content)
+        
+        self.assertEqual([index.line_of(start) for start, _ in index.separators], separator_lines)
+        for start, end in index.separators:
+            self.assertEqual(start, line_starts[index.line_of(start) - 1])
+            self.assertEqual(content[start:end].strip(), '---')
+        
+        for line_number, line_start in enumerate(line_starts, 1):
+            self.assertEqual(index.line_of(line_start), line_number)
+        
+        self.assertEqual(
+            [(index.line_of(offset), is_closing, tag_name, attributes)
+             for offset, is_closing, tag_name, attributes in index.tags],
+            tags
+        )
+    
+    def test_matches_line_based_reading(self):
+        rnd = random.Random(0)
+        for _ in range(300):
+            text = random_text(rnd)
+            self.assert_matches_reference(build_index(self.write(text)), text)
+    
+    def test_line_of_in_any_order(self):
+        rnd = random.Random(2)
+        text = '\n'.join(rnd.choice(LINES) for _ in range(200))
+        index = build_index(self.write(text))
+        expected = [text.count('\n', 0, offset) + 1 for offset in range(len(text) + 1)]
+        
+        offsets = list(range(len(text) + 1))
+        rnd.shuffle(offsets)
+        for offset in offsets:
+            self.assertEqual(index.line_of(offset), expected[offset])
+    
+    def test_changed_file_is_reindexed(self):
+        path = self.write('---\nalpha\n')
+        build_index(path)
+        
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('---\nalpha\n---\nbeta\n\n')
+        os.utime(path, ns=(0, 0))
+        
+        self.assert_matches_reference(build_index(path), '---\nalpha\n---\nbeta\n\n')
+    
+    def test_same_size_edit_with_restored_mtime_is_reindexed(self):
+        # cp -p, rsync -t and tar x all restore the mtime of a rewritten file
+        path = self.write('---\nalpha <quote>x</quote>\n---\nbeta\n')
+        stat = os.stat(path)
+        self.assertEqual(len(build_index(path).separators), 2)
+        
+        # A later run sees the same key as the earlier one
+        sample_index._build_index.cache_clear()
+        edited = 'xxx\nalpha <quote>x</quote>\nxxx\nbeta\n'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(edited)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        
+        index = build_index(path)
+        self.assertEqual(index.separators, [])
+        self.assert_matches_reference(index, edited)
+    
+    def test_no_files_written_next_to_input(self):
+        path = self.write('---\nalpha\n')
+        build_index(path)
+        self.assertEqual(os.listdir(self.directory), [os.path.basename(path)])
+
+if __name__ == "__main__":
+    unittest.main()
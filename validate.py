@@ -8,117 +8,244 @@ Validates Sanskrit text markup according to the specified format:
 - Proper tag closure
 - Unique IDs within each prompt (separated by ---)
 - Proper attribute usage
+
+The module passes `mypy --strict` and can be compiled ahead of time with
+`mypyc validate.py`. Python then imports the compiled extension in place of
+this file, which stays the pure-Python fallback.
 """
 
 import re
-import xml.etree.ElementTree as ET
-from typing import List, Dict, Set, Tuple
+import sys
+from typing import List, Dict, Set, Tuple, Optional, Sequence, Iterator, Union, overload
+from array import array
 from dataclasses import dataclass
 
+from sample_index import SampleIndex, build_index
+
+# Message templates per error type, filled in with the arguments given to _add_error
+# only when the error is read from a ValidationErrors view
+ERROR_MESSAGES = {
+    "FILE_ERROR": "File not found: {0}",
+    "ENCODING_ERROR": "File encoding error - expected UTF-8",
+    "INVALID_TAG": "Invalid tag '<{0}>' in prompt {1}. Valid tags are: {2}",
+    "UNMATCHED_CLOSING_TAG": "Closing tag </{0}> without matching opening tag in prompt {1}",
+    "MISMATCHED_TAG": "Closing tag </{0}> doesn't match opening tag <{1}> from line {2} in prompt {3}",
+    "UNCLOSED_TAG": "Opening tag <{0}> not closed in prompt {1}",
+    "MALFORMED_ATTRIBUTE": "Malformed attribute syntax in prompt {0}: '{1}'",
+    "INVALID_ATTRIBUTE": "Invalid attribute '{0}' in prompt {1}. Valid attributes are: {2}",
+    "DUPLICATE_ID": "Duplicate ID '{0}' in prompt {1}",
+    "INVALID_TYPE_VALUE": "Invalid type value '{0}' in prompt {1}. Valid values are: {2}",
+    "INVALID_ATTRIBUTE_USAGE": "Attribute '{0}' should only be used in <quote> tags, not <{1}> in prompt {2}",
+}
+
 @dataclass
 class ValidationError:
     line_number: int
     error_type: str
     message: str
 
+class ValidationErrors(Sequence[ValidationError]):
+    """
+    Read-only list of the errors found by one validate_file() call.
+    
+    It wraps the validator's error columns, so len() and truth tests are free
+    and each ValidationError is only built when it is read.
+    """
+    
+    def __init__(self, lines: 'array[int]', types: List[str], args: List[Tuple[object, ...]]) -> None:
+        self._lines = lines
+        self._types = types
+        self._args = args
+    
+    def __len__(self) -> int:
+        return len(self._lines)
+    
+    @overload
+    def __getitem__(self, position: int) -> ValidationError: ...
+    @overload
+    def __getitem__(self, position: slice) -> List[ValidationError]: ...
+    def __getitem__(self, position: Union[int, slice]) -> Union[ValidationError, List[ValidationError]]:
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        return self._build(self._lines[position], self._types[position], self._args[position])
+    
+    def __iter__(self) -> Iterator[ValidationError]:
+        for line_number, error_type, args in zip(self._lines, self._types, self._args):
+            yield self._build(line_number, error_type, args)
+    
+    @staticmethod
+    def _build(line_number: int, error_type: str, args: Tuple[object, ...]) -> ValidationError:
+        """Format one stored error's message; the only place ERROR_MESSAGES is used."""
+        return ValidationError(line_number, error_type, ERROR_MESSAGES[error_type].format(*args))
+    
+    def __eq__(self, other: object) -> bool:
+        # Compares equal to a list of the same errors, as validate_file() used to return
+        if isinstance(other, (list, ValidationErrors)):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    __hash__ = None  # type: ignore[assignment]
+    
+    def __repr__(self) -> str:
+        return repr(list(self))
+
 class SanskritValidator:
-    def __init__(self):
+    def __init__(self) -> None:
         self.valid_tags = {'quote', 'author', 'title'}
         self.valid_attributes = {'id', 'authorid', 'titleid', 'type', 'authorid2', 'chapterid'}
         self.valid_type_values = {'generic', 'chapter', 'speaker', 'possiblyauthorial'}  # Add more as needed
-        self.errors: List[ValidationError] = []
-    
-    def validate_file(self, filename: str) -> List[ValidationError]:
-        """Validate a Sanskrit markup file."""
-        self.errors = []
-        
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except FileNotFoundError:
-            self.errors.append(ValidationError(0, "FILE_ERROR", f"File not found: {filename}"))
-            return self.errors
-        except UnicodeDecodeError:
-            self.errors.append(ValidationError(0, "ENCODING_ERROR", "File encoding error - expected UTF-8"))
-            return self.errors
+        # Errors are stored column-wise and only turned into ValidationError objects on access
+        self._error_lines = array('i')
+        self._error_types: List[str] = []
+        self._error_args: List[Tuple[object, ...]] = []
+        # Joined once here rather than for every error message
+        self._valid_tags_str = ', '.join(sorted(self.valid_tags))
+        self._valid_attrs_str = ', '.join(sorted(self.valid_attributes))
+        self._valid_type_values_str = ', '.join(sorted(self.valid_type_values))
+        # Valid tags are tracked on the closure stack by small integer ids
+        self._tag_names = sorted(self.valid_tags)
+        self._tag_ids = {tag_name: tag_id for tag_id, tag_name in enumerate(self._tag_names)}
+        self._attr_re = re.compile(r'(\w+)=(["\'])([^"\']*)\2')
+    
+    @property
+    def errors(self) -> ValidationErrors:
+        """Errors found in the last validated file."""
+        return ValidationErrors(self._error_lines, self._error_types, self._error_args)
+    
+    @property
+    def error_count(self) -> int:
+        """Number of errors found in the last validated file, without building them."""
+        return len(self._error_lines)
+    
+    def _add_error(self, line_number: int, error_type: str, *args: object) -> None:
+        """Record an error; its message is formatted only when a ValidationErrors view reads it."""
+        self._error_lines.append(line_number)
+        self._error_types.append(sys.intern(error_type))
+        self._error_args.append(args)
+    
+    def validate_file(self, filename: str, index: Optional[SampleIndex] = None) -> ValidationErrors:
+        """Validate a Sanskrit markup file, using its index if one is already built."""
+        # New columns rather than cleared ones, so views returned by earlier calls stay valid
+        self._error_lines = array('i')
+        self._error_types = []
+        self._error_args = []
+        
+        if index is None:
+            try:
+                index = build_index(filename)
+            except FileNotFoundError:
+                self._add_error(0, "FILE_ERROR", filename)
+                return self.errors
+            except UnicodeDecodeError:
+                self._add_error(0, "ENCODING_ERROR")
+                return self.errors
         
         # Split into prompts
-        prompts = self._split_into_prompts(content)
+        prompts = self._split_into_prompts(index)
         
-        for prompt_idx, (prompt_content, start_line) in enumerate(prompts):
-            self._validate_prompt(prompt_content, start_line, prompt_idx + 1)
+        # Tags are indexed in file order, so each prompt takes the next run of them
+        tags = index.tags
+        first_tag = 0
+        
+        for prompt_idx, (prompt_start, prompt_end) in enumerate(prompts):
+            end_tag = first_tag
+            while end_tag < len(tags) and tags[end_tag][0] < prompt_end:
+                end_tag += 1
+            
+            self._validate_prompt(index, tags[first_tag:end_tag], prompt_idx + 1)
+            first_tag = end_tag
         
         return self.errors
     
-    def _split_into_prompts(self, content: str) -> List[Tuple[str, int]]:
-        """Split content into prompts separated by --- at line start."""
-        lines = content.split('\n')
-        prompts = []
-        current_prompt = []
-        start_line = 1
-        
-        for line_num, line in enumerate(lines, 1):
-            if line.strip() == '---':
-                if current_prompt:
-                    prompts.append(('\n'.join(current_prompt), start_line))
-                current_prompt = []
-                start_line = line_num + 1
-            else:
-                current_prompt.append(line)
+    def _split_into_prompts(self, index: SampleIndex) -> List[Tuple[int, int]]:
+        """Split content into prompts separated by --- at line start.
+        
+        Returns (start, end) character offsets of each prompt's lines, excluding
+        the newline before the next separator.
+        """
+        prompts: List[Tuple[int, int]] = []
+        prompt_start = 0
+        
+        for separator_start, separator_end in index.separators:
+            # Adjacent separators (or one on the first line) enclose no lines
+            if prompt_start < separator_start:
+                prompts.append((prompt_start, separator_start - 1))
+            prompt_start = separator_end + 1
         
         # Add the last prompt if it exists
-        if current_prompt:
-            prompts.append(('\n'.join(current_prompt), start_line))
+        if prompt_start <= len(index.content):
+            prompts.append((prompt_start, len(index.content)))
         
         return prompts
     
-    def _validate_prompt(self, prompt_content: str, start_line: int, prompt_number: int):
-        """Validate a single prompt."""
-        lines = prompt_content.split('\n')
+    def _validate_prompt(self, index: SampleIndex, tags: List[Tuple[int, str, str, str]], prompt_number: int) -> None:
+        """Validate a single prompt's tags, attributes and tag closure in one pass."""
         used_ids: Set[str] = set()
+        # Open tags as parallel arrays of tag ids and line numbers
+        stack_tags = array('i')
+        stack_lines = array('i')
         
-        for line_offset, line in enumerate(lines):
-            current_line = start_line + line_offset
+        # Walk all XML-like tags in the prompt
+        for tag_offset, is_closing, tag_name, attributes_str in tags:
+            current_line = index.line_of(tag_offset)
+            
+            # Validate tag name
+            tag_id = self._tag_ids.get(tag_name)
+            if tag_id is None:
+                self._add_error(
+                    current_line, 
+                    "INVALID_TAG", 
+                    tag_name, prompt_number, self._valid_tags_str
+                )
+                continue
             
-            # Find all XML-like tags in the line
-            tags = re.findall(r'<(/?)(\w+)([^>]*)>', line)
+            if is_closing:
+                if not stack_tags:
+                    self._add_error(
+                        current_line,
+                        "UNMATCHED_CLOSING_TAG",
+                        tag_name, prompt_number
+                    )
+                elif stack_tags[-1] != tag_id:
+                    self._add_error(
+                        current_line,
+                        "MISMATCHED_TAG",
+                        tag_name, self._tag_names[stack_tags[-1]], stack_lines[-1], prompt_number
+                    )
+                else:
+                    stack_tags.pop()
+                    stack_lines.pop()
+                continue
+            
+            # Parse and validate attributes
+            if attributes_str.strip():
+                self._validate_attributes(attributes_str.strip(), current_line, prompt_number, used_ids, tag_name)
             
-            for is_closing, tag_name, attributes_str in tags:
-                # Validate tag name
-                if tag_name not in self.valid_tags:
-                    self.errors.append(ValidationError(
-                        current_line, 
-                        "INVALID_TAG", 
-                        f"Invalid tag '<{tag_name}>' in prompt {prompt_number}. Valid tags are: {', '.join(self.valid_tags)}"
-                    ))
-                    continue
-                
-                # Skip validation for closing tags
-                if is_closing:
-                    continue
-                
-                # Parse and validate attributes
-                if attributes_str.strip():
-                    self._validate_attributes(attributes_str.strip(), current_line, prompt_number, used_ids, tag_name)
-        
-        # Validate XML structure
-        self._validate_xml_structure(prompt_content, start_line, prompt_number)
-    
-    def _validate_attributes(self, attr_str: str, line_number: int, prompt_number: int, used_ids: Set[str], tag_name: str):
+            stack_tags.append(tag_id)
+            stack_lines.append(current_line)
+        
+        # Check for unclosed tags
+        for tag_id, line_num in zip(stack_tags, stack_lines):
+            self._add_error(
+                line_num,
+                "UNCLOSED_TAG",
+                self._tag_names[tag_id], prompt_number
+            )
+    
+    def _validate_attributes(self, attr_str: str, line_number: int, prompt_number: int, used_ids: Set[str], tag_name: str) -> None:
         """Validate attributes in a tag."""
         # Parse attributes
-        attr_pattern = r'(\w+)=(["\'])([^"\']*)\2'
-        attributes = re.findall(attr_pattern, attr_str)
+        attributes = self._attr_re.findall(attr_str)
         
         # Check for malformed attributes
         if not attributes:
             # Check if there's an attempt at attributes but they're malformed
             if '=' in attr_str:
-                self.errors.append(ValidationError(
+                self._add_error(
                     line_number,
                     "MALFORMED_ATTRIBUTE",
-                    f"Malformed attribute syntax in prompt {prompt_number}: '{attr_str}'"
-                ))
+                    prompt_number, attr_str
+                )
             return
         
         parsed_attrs = {name: value for name, _, value in attributes}
@@ -126,21 +253,21 @@ class SanskritValidator:
         # Validate attribute names
         for attr_name in parsed_attrs:
             if attr_name not in self.valid_attributes:
-                self.errors.append(ValidationError(
+                self._add_error(
                     line_number,
                     "INVALID_ATTRIBUTE",
-                    f"Invalid attribute '{attr_name}' in prompt {prompt_number}. Valid attributes are: {', '.join(self.valid_attributes)}"
-                ))
+                    attr_name, prompt_number, self._valid_attrs_str
+                )
         
         # Validate ID uniqueness within prompt
         if 'id' in parsed_attrs:
             id_value = parsed_attrs['id']
             if id_value in used_ids:
-                self.errors.append(ValidationError(
+                self._add_error(
                     line_number,
                     "DUPLICATE_ID",
-                    f"Duplicate ID '{id_value}' in prompt {prompt_number}"
-                ))
+                    id_value, prompt_number
+                )
             else:
                 used_ids.add(id_value)
         
@@ -148,80 +275,33 @@ class SanskritValidator:
         if 'type' in parsed_attrs:
             type_value = parsed_attrs['type']
             if type_value not in self.valid_type_values:
-                self.errors.append(ValidationError(
+                self._add_error(
                     line_number,
                     "INVALID_TYPE_VALUE",
-                    f"Invalid type value '{type_value}' in prompt {prompt_number}. Valid values are: {', '.join(self.valid_type_values)}"
-                ))
+                    type_value, prompt_number, self._valid_type_values_str
+                )
         
         # Validate tag-specific attribute usage
         self._validate_tag_specific_attributes(tag_name, parsed_attrs, line_number, prompt_number)
     
-    def _validate_tag_specific_attributes(self, tag_name: str, attributes: Dict[str, str], line_number: int, prompt_number: int):
+    def _validate_tag_specific_attributes(self, tag_name: str, attributes: Dict[str, str], line_number: int, prompt_number: int) -> None:
         """Validate that attributes are used appropriately for specific tags."""
         # Check for authorid/titleid usage in non-quote tags
         if tag_name != 'quote':
             if 'authorid' in attributes:
-                self.errors.append(ValidationError(
+                self._add_error(
                     line_number,
                     "INVALID_ATTRIBUTE_USAGE",
-                    f"Attribute 'authorid' should only be used in <quote> tags, not <{tag_name}> in prompt {prompt_number}"
-                ))
+                    'authorid', tag_name, prompt_number
+                )
             if 'titleid' in attributes:
-                self.errors.append(ValidationError(
+                self._add_error(
                     line_number,
                     "INVALID_ATTRIBUTE_USAGE",
-                    f"Attribute 'titleid' should only be used in <quote> tags, not <{tag_name}> in prompt {prompt_number}"
-                ))
-    
-    def _validate_xml_structure(self, prompt_content: str, start_line: int, prompt_number: int):
-        """Validate XML structure for proper tag closure."""
-        # Extract just the XML tags to check structure
-        xml_tags = re.findall(r'<[^>]*>', prompt_content)
-        
-        # Create a simplified XML structure to validate
-        tag_stack = []
-        line_offset = 0
-        
-        for line_offset, line in enumerate(prompt_content.split('\n')):
-            current_line = start_line + line_offset
-            
-            # Find all tags in this line
-            line_tags = re.findall(r'<(/?)(\w+)[^>]*>', line)
-            
-            for is_closing, tag_name in line_tags:
-                if tag_name not in self.valid_tags:
-                    continue  # Already reported as invalid tag
-                
-                if is_closing:
-                    if not tag_stack:
-                        self.errors.append(ValidationError(
-                            current_line,
-                            "UNMATCHED_CLOSING_TAG",
-                            f"Closing tag </{tag_name}> without matching opening tag in prompt {prompt_number}"
-                        ))
-                    elif tag_stack[-1][0] != tag_name:
-                        self.errors.append(ValidationError(
-                            current_line,
-                            "MISMATCHED_TAG",
-                            f"Closing tag </{tag_name}> doesn't match opening tag <{tag_stack[-1][0]}> from line {tag_stack[-1][1]} in prompt {prompt_number}"
-                        ))
-                    else:
-                        tag_stack.pop()
-                else:
-                    tag_stack.append((tag_name, current_line))
-        
-        # Check for unclosed tags
-        for tag_name, line_num in tag_stack:
-            self.errors.append(ValidationError(
-                line_num,
-                "UNCLOSED_TAG",
-                f"Opening tag <{tag_name}> not closed in prompt {prompt_number}"
-            ))
+                    'titleid', tag_name, prompt_number
+                )
 
-def main():
-    import sys
-    
+def main() -> None:
     if len(sys.argv) != 2:
         print("Usage: python sanskrit_validator.py <filename>")
         sys.exit(1)
@@ -237,7 +317,7 @@ def main():
         print()
         
         # Group errors by type for better readability
-        error_groups = {}
+        error_groups: Dict[str, List[ValidationError]] = {}
         for error in errors:
             if error.error_type not in error_groups:
                 error_groups[error.error_type] = []